@@ -0,0 +1,159 @@
+"""
+Negotiated response compression.
+
+Responses of at least ``COMPRESSION_MIN_BYTES`` are compressed with brotli
+when the client accepts ``br``, otherwise with gzip. Smaller responses,
+responses that already carry a Content-Encoding and clients that accept
+neither are left alone.
+Streamed responses are compressed chunk by chunk.
+"""
+
+import gzip
+import os
+import zlib
+from typing import Optional
+
+import brotli
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, honouring q=0"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if "br" in accepted or "*" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress = self._compressor.process
+            self._flush = self._compressor.finish
+        else:
+            # wbits=31 writes the gzip header and trailer
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._compress = self._compressor.compress
+            self._flush = self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._flush()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """ASGI middleware applying :func:`choose_encoding` to HTTP responses"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.buffer = b""
+        self.passthrough = False
+        self.compressor = None
+
+    async def send(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Hold the start until enough body has arrived to decide the headers
+            self.start_message = message
+            headers = {name.lower(): value for name, value in message.get("headers", [])}
+            content_length = headers.get(b"content-length")
+            self.passthrough = b"content-encoding" in headers or (
+                content_length is not None and int(content_length) < self.minimum_size
+            )
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            if self.start_message is not None:
+                await self._send(self.start_message)
+                self.start_message = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            # Middleware further in may stream even tiny bodies, so buffer
+            # until the threshold is reached or the body ends
+            self.buffer += body
+            if more_body and len(self.buffer) < self.minimum_size:
+                return
+            body, self.buffer = self.buffer, b""
+            start, self.start_message = self.start_message, None
+
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            headers = [
+                (name, value) for name, value in start.get("headers", [])
+                if name.lower() != b"content-length"
+            ]
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+            headers.append((b"vary", b"Accept-Encoding"))
+
+            if not more_body:
+                body = compress(body, self.encoding)
+                headers.append((b"content-length", str(len(body)).encode("latin-1")))
+                await self._send({**start, "headers": headers})
+                await self._send({"type": "http.response.body", "body": body})
+                return
+
+            self.compressor = _Compressor(self.encoding)
+            await self._send({**start, "headers": headers})
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -1,8 +1,11 @@
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from models import Course, Application, FormStatus, CourseCategoryEnum
-from schemas import ApplicationCreate, CourseCreate, FormStatusUpdate
-from typing import List, Optional
+import re
+from sqlalchemy import delete, func, insert, literal, or_, select, text, update
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.exc import IntegrityError, OperationalError
+from models import Course, CourseModeQuota, Application, ApplicationSearchIndex, FormStatus, CourseCategoryEnum, ModeOfStudyEnum
+from models import SQLITE_SEARCH_TRIGGERS
+from schemas import ApplicationCreate, CourseCreate, CourseQuotaUpdate, FormStatusUpdate
+from typing import Callable, List, Optional, Tuple, TypeVar
 
 
 # Course CRUD operations
@@ -28,6 +31,171 @@ def create_course(db: Session, course: CourseCreate) -> Course:
     return db_course
 
 
+# Seat quota operations
+#
+# Seats are counted with single conditional UPDATEs ("take a seat if one is
+# left"); a rowcount of 0 means the course is full. The UPDATE still locks the
+# counter row until commit, so submissions to the same limited course queue
+# behind each other. Counters are therefore only kept for courses and modes
+# that have a limit (seeded from COUNT(*) when the limit is set), and
+# submissions to unlimited courses take no lock at all.
+#
+# Writers claim their seats before touching the application row. InnoDB can
+# still pick a transaction as a deadlock victim (e.g. two edits moving seats in
+# opposite directions), so seat-claiming writes go through _retry_on_deadlock.
+MYSQL_DEADLOCK_ERROR = 1213
+DEADLOCK_RETRIES = 3
+
+T = TypeVar("T")
+
+
+def _is_deadlock(error: OperationalError) -> bool:
+    args = getattr(error.orig, "args", ())
+    return bool(args) and args[0] == MYSQL_DEADLOCK_ERROR
+
+
+def _retry_on_deadlock(db: Session, write: Callable[[], T]) -> T:
+    """Run a write transaction, rolling back and running it again if it deadlocks"""
+    for attempt in range(1, DEADLOCK_RETRIES + 1):
+        try:
+            return write()
+        except OperationalError as e:
+            db.rollback()
+            if attempt == DEADLOCK_RETRIES or not _is_deadlock(e):
+                raise
+
+
+def _take_seat(db: Session, course: Course, mode: ModeOfStudyEnum) -> None:
+    """Claim one course seat and one mode seat, or raise ValueError if full"""
+    if course.seat_limit is not None:
+        result = db.execute(
+            update(Course)
+            .where(Course.id == course.id, Course.seats_taken < Course.seat_limit)
+            .values(seats_taken=Course.seats_taken + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            raise ValueError(f"Course with ID {course.id} is full")
+
+    _take_mode_seat(db, course.id, mode)
+
+
+def _take_mode_seat(db: Session, course_id: int, mode: ModeOfStudyEnum) -> None:
+    if db.get(CourseModeQuota, (course_id, mode)) is None:
+        return
+    result = db.execute(
+        update(CourseModeQuota)
+        .where(
+            CourseModeQuota.course_id == course_id,
+            CourseModeQuota.mode_of_study == mode,
+            CourseModeQuota.seats_taken < CourseModeQuota.seat_limit,
+        )
+        .values(seats_taken=CourseModeQuota.seats_taken + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        raise ValueError(f"No {mode.value} seats left for course with ID {course_id}")
+
+
+def _release_seat(db: Session, course_id: int, mode: ModeOfStudyEnum, release_course: bool = True) -> None:
+    if release_course:
+        db.execute(
+            update(Course)
+            .where(Course.id == course_id, Course.seat_limit.is_not(None), Course.seats_taken > 0)
+            .values(seats_taken=Course.seats_taken - 1)
+            .execution_options(synchronize_session=False)
+        )
+    db.execute(
+        update(CourseModeQuota)
+        .where(
+            CourseModeQuota.course_id == course_id,
+            CourseModeQuota.mode_of_study == mode,
+            CourseModeQuota.seats_taken > 0,
+        )
+        .values(seats_taken=CourseModeQuota.seats_taken - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _move_seat(db: Session, old_course_id: int, old_mode: ModeOfStudyEnum,
+               new_course: Course, new_mode: ModeOfStudyEnum) -> None:
+    """Move an application's seat when an edit changes its course or mode"""
+    if old_course_id == new_course.id:
+        if old_mode != new_mode:
+            _release_seat(db, old_course_id, old_mode, release_course=False)
+            _take_mode_seat(db, new_course.id, new_mode)
+        return
+
+    # Touch the course rows in id order so two opposite moves usually lock
+    # them in the same order; _retry_on_deadlock covers the rest
+    if old_course_id < new_course.id:
+        _release_seat(db, old_course_id, old_mode)
+        _take_seat(db, new_course, new_mode)
+    else:
+        _take_seat(db, new_course, new_mode)
+        _release_seat(db, old_course_id, old_mode)
+
+
+def _count_applications(db: Session, course_id: int, mode: Optional[ModeOfStudyEnum] = None) -> int:
+    query = db.query(func.count(Application.id)).filter(Application.course_id == course_id)
+    if mode is not None:
+        query = query.filter(Application.mode_of_study == mode)
+    return query.scalar()
+
+
+def get_course_quota(db: Session, course: Course) -> dict:
+    """Course and per-mode seat usage"""
+    return {
+        "course_id": course.id,
+        "seat_limit": course.seat_limit,
+        # Unlimited courses keep no counter
+        "seats_taken": course.seats_taken if course.seat_limit is not None else _count_applications(db, course.id),
+        "mode_quotas": db.query(CourseModeQuota).filter(CourseModeQuota.course_id == course.id).all(),
+    }
+
+
+def set_course_quota(db: Session, course: Course, quota: CourseQuotaUpdate) -> dict:
+    """Set the course seat limit and add, change or remove per-mode limits"""
+    if "seat_limit" in quota.model_fields_set:
+        if quota.seat_limit is not None and course.seat_limit is None:
+            course.seats_taken = _count_applications(db, course.id)
+        course.seat_limit = quota.seat_limit
+    for mode, seat_limit in quota.mode_seat_limits.items():
+        mode_quota = db.get(CourseModeQuota, (course.id, mode))
+        if seat_limit is None:
+            if mode_quota is not None:
+                db.delete(mode_quota)
+            continue
+        if mode_quota is None:
+            taken = _count_applications(db, course.id, mode)
+            mode_quota = CourseModeQuota(course_id=course.id, mode_of_study=mode, seats_taken=taken)
+            db.add(mode_quota)
+        mode_quota.seat_limit = seat_limit
+    db.commit()
+    db.refresh(course)
+    return get_course_quota(db, course)
+
+
+def recount_seats(db: Session) -> None:
+    """Recompute every seat counter from the applications table, e.g. after a bulk load"""
+    db.execute(
+        update(Course)
+        .values(seats_taken=select(func.count(Application.id))
+                .where(Application.course_id == Course.id)
+                .scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(CourseModeQuota)
+        .values(seats_taken=select(func.count(Application.id))
+                .where(Application.course_id == CourseModeQuota.course_id,
+                       Application.mode_of_study == CourseModeQuota.mode_of_study)
+                .scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
 # Application CRUD operations
 def get_application_by_staff_number(db: Session, staff_number: str) -> Optional[Application]:
     """Check if staff member has already applied"""
@@ -50,15 +218,30 @@ def create_application(db: Session, application: ApplicationCreate) -> Applicati
     if course.category != application.course_category:
         raise ValueError(f"Course category mismatch")
     
-    db_application = Application(**application.model_dump())
-    db.add(db_application)
-    try:
+    def write() -> Application:
+        # Claim the seat before writing the application, so every submission
+        # locks the course row first and the insert cannot deadlock with it
+        _take_seat(db, course, application.mode_of_study)
+        db_application = Application(**application.model_dump())
+        db.add(db_application)
+        db.flush()
+        db.add(ApplicationSearchIndex(
+            application_id=db_application.id,
+            document=_search_document(db_application, course),
+        ))
         db.commit()
-        db.refresh(db_application)
         return db_application
+
+    try:
+        db_application = _retry_on_deadlock(db, write)
     except IntegrityError:
         db.rollback()
         raise ValueError(f"Staff number {application.staff_number} has already submitted an application")
+    except ValueError:
+        db.rollback()
+        raise
+    db.refresh(db_application)
+    return db_application
 
 
 def update_application(db: Session, staff_number: str, application: ApplicationCreate) -> Application:
@@ -76,27 +259,202 @@ def update_application(db: Session, staff_number: str, application: ApplicationC
     if course.category != application.course_category:
         raise ValueError(f"Course category mismatch")
     
-    # Update fields
-    db_application.first_name = application.first_name
-    db_application.last_name = application.last_name
-    db_application.designation = application.designation
-    db_application.division = application.division
-    db_application.course_category = application.course_category
-    db_application.course_id = application.course_id
-    db_application.mode_of_study = application.mode_of_study
-    # application_date stays as original or updates? Usually application date might update to today or stay same.
-    # Requirement doesn't specify, but often edits update the date or keep original.
-    # Let's keep the date from the input (which in frontend defaults to today)
-    db_application.application_date = application.application_date
-    
-    db.commit()
+    def write() -> None:
+        # Seats first, as in create_application, then the application row
+        _move_seat(db, db_application.course_id, db_application.mode_of_study,
+                   course, application.mode_of_study)
+
+        # Update fields
+        db_application.first_name = application.first_name
+        db_application.last_name = application.last_name
+        db_application.designation = application.designation
+        db_application.division = application.division
+        db_application.course_category = application.course_category
+        db_application.course_id = application.course_id
+        db_application.mode_of_study = application.mode_of_study
+        # application_date stays as original or updates? Usually application date might update to today or stay same.
+        # Requirement doesn't specify, but often edits update the date or keep original.
+        # Let's keep the date from the input (which in frontend defaults to today)
+        db_application.application_date = application.application_date
+
+        search_entry = db.get(ApplicationSearchIndex, db_application.id)
+        if search_entry is None:
+            search_entry = ApplicationSearchIndex(application_id=db_application.id)
+            db.add(search_entry)
+        search_entry.document = _search_document(db_application, course)
+        db.commit()
+
+    try:
+        _retry_on_deadlock(db, write)
+    except ValueError:
+        db.rollback()
+        raise
     db.refresh(db_application)
     return db_application
 
 
 def get_all_applications(db: Session) -> List[Application]:
-    """Get all applications"""
-    return db.query(Application).all()
+    """Get all applications with their course loaded in the same query"""
+    return db.query(Application).options(joinedload(Application.course)).all()
+
+
+# Columns that can be requested with ?fields= on the applications list
+APPLICATION_FIELDS = {
+    "id": Application.id,
+    "staff_number": Application.staff_number,
+    "email": Application.email,
+    "application_date": Application.application_date,
+    "first_name": Application.first_name,
+    "last_name": Application.last_name,
+    "designation": Application.designation,
+    "division": Application.division,
+    "course_category": Application.course_category,
+    "course_id": Application.course_id,
+    "mode_of_study": Application.mode_of_study,
+    "created_at": Application.created_at,
+    "course_name": Course.name,
+}
+COURSE_FIELDS = {"course_name"}
+
+
+def get_application_fields(db: Session, fields: List[str]) -> List[dict]:
+    """
+    Get only the requested columns of every application.
+
+    Selects just those columns and joins courses only when a course column
+    is asked for, instead of loading full ORM objects with their course.
+    """
+    query = select(*(APPLICATION_FIELDS[field].label(field) for field in fields))
+    if COURSE_FIELDS.intersection(fields):
+        query = query.join(Course, Application.course_id == Course.id)
+    else:
+        query = query.select_from(Application)
+    return [dict(zip(fields, row)) for row in db.execute(query.order_by(Application.id))]
+
+
+# Application search
+#
+# Every application has one document in application_search_index. MariaDB
+# searches it with a FULLTEXT index, SQLite with the FTS5 mirror table that
+# triggers keep in sync (see models.py). Each query token matches as a prefix
+# and all tokens must match.
+SEARCH_MAX_TOKENS = 8
+# Ranking scores every match, so very broad queries (e.g. a two-letter
+# prefix) are listed newest first instead of ranked
+SEARCH_RANK_LIMIT = 2000
+# InnoDB ignores tokens shorter than innodb_ft_min_token_size (3 by default),
+# so shorter ones are matched as word prefixes with REGEXP instead
+MYSQL_MIN_TOKEN_SIZE = 3
+
+
+def _search_document(application: Application, course: Course) -> str:
+    return " ".join([
+        application.first_name,
+        application.last_name,
+        application.staff_number,
+        application.designation,
+        application.division,
+        course.name,
+    ])
+
+
+def _mysql_search_filter(tokens: List[str]) -> Tuple[str, dict]:
+    """
+    WHERE clause for MariaDB: FULLTEXT boolean mode for tokens the index
+    holds, plus a word-prefix REGEXP per shorter token so that results match
+    SQLite's. Without a longer token to narrow the FULLTEXT match first, the
+    REGEXP scans every document.
+    """
+    conditions, params = [], {}
+    long_tokens = [token for token in tokens if len(token) >= MYSQL_MIN_TOKEN_SIZE]
+    if long_tokens:
+        conditions.append("MATCH(document) AGAINST(:match IN BOOLEAN MODE)")
+        params["match"] = " ".join(f"+{token}*" for token in long_tokens)
+    short_tokens = [token for token in tokens if len(token) < MYSQL_MIN_TOKEN_SIZE]
+    for i, token in enumerate(short_tokens):
+        # Tokens are \w+ only, so they need no escaping inside the pattern
+        conditions.append(f"document REGEXP :short{i}")
+        params[f"short{i}"] = f"\\b{token}"
+    return " AND ".join(conditions), params
+
+
+def rebuild_search_index(db: Session) -> int:
+    """Rebuild every search document in one INSERT ... SELECT, e.g. after a bulk load"""
+    document = (
+        Application.first_name + literal(" ") + Application.last_name + literal(" ")
+        + Application.staff_number + literal(" ") + Application.designation + literal(" ")
+        + Application.division + literal(" ") + Course.name
+    )
+    sqlite = db.get_bind().dialect.name == "sqlite"
+    if sqlite:
+        # Per-row FTS triggers make a bulk rebuild several times slower, so
+        # they are dropped and the FTS table is rebuilt in one pass instead
+        db.execute(text("INSERT INTO application_search_fts(application_search_fts) VALUES ('delete-all')"))
+        for name in SQLITE_SEARCH_TRIGGERS:
+            db.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+
+    db.execute(delete(ApplicationSearchIndex))
+    db.execute(
+        insert(ApplicationSearchIndex).from_select(
+            ["application_id", "document"],
+            select(Application.id, document).join(Course, Application.course_id == Course.id),
+        )
+    )
+
+    if sqlite:
+        db.execute(text("INSERT INTO application_search_fts(application_search_fts) VALUES ('rebuild')"))
+        for statement in SQLITE_SEARCH_TRIGGERS.values():
+            db.execute(text(statement))
+    db.commit()
+    return db.query(func.count(ApplicationSearchIndex.application_id)).scalar()
+
+
+def search_applications(db: Session, query: str, limit: int, offset: int) -> Tuple[int, List[Application]]:
+    """
+    Ranked full-text search over applications.
+
+    Returns the total number of matches and one page of applications, best
+    match first (newest first past SEARCH_RANK_LIMIT matches), with their
+    course loaded.
+    """
+    tokens = re.findall(r"\w+", query.lower())[:SEARCH_MAX_TOKENS]
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        params = {"match": " ".join(f'"{token}"*' for token in tokens)}
+        count_sql = "SELECT count(*) FROM application_search_fts WHERE application_search_fts MATCH :match"
+        page_sql = (
+            "SELECT rowid FROM application_search_fts "
+            "WHERE application_search_fts MATCH :match ORDER BY {order} LIMIT :limit OFFSET :offset"
+        )
+        # Ties need a unique key or equal scores can swap between pages
+        ranked, newest = "bm25(application_search_fts), rowid DESC", "rowid DESC"
+    else:
+        where, params = _mysql_search_filter(tokens)
+        count_sql = f"SELECT count(*) FROM application_search_index WHERE {where}"
+        page_sql = (
+            "SELECT application_id FROM application_search_index "
+            f"WHERE {where} ORDER BY {{order}} LIMIT :limit OFFSET :offset"
+        )
+        newest = "application_id DESC"
+        # Only the FULLTEXT part can be ranked
+        ranked = (
+            "MATCH(document) AGAINST(:match IN BOOLEAN MODE) DESC, application_id DESC"
+            if "match" in params else newest
+        )
+
+    if not tokens:
+        return 0, []
+
+    total = db.execute(text(count_sql), params).scalar()
+    order = ranked if total <= SEARCH_RANK_LIMIT else newest
+    ids = db.execute(text(page_sql.format(order=order)), {**params, "limit": limit, "offset": offset}).scalars().all()
+    if not ids:
+        return total, []
+
+    applications = db.query(Application).options(joinedload(Application.course)).filter(Application.id.in_(ids)).all()
+    by_id = {application.id: application for application in applications}
+    return total, [by_id[application_id] for application_id in ids if application_id in by_id]
 
 
 # Form Status CRUD operations
@@ -12,7 +12,7 @@ engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=3600,
-    echo=True  # Set to False in production
+    echo=os.getenv("SQL_ECHO", "false").lower() == "true"  # See slow_queries.py for production logging
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,229 @@
+"""
+Synthetic dataset generator for scale testing
+
+Creates courses and applications with realistic distributions over
+divisions, designations, course categories and study modes, and bulk-loads
+them with Core executemany batches. The same seed always produces the same
+data, so production-scale performance problems can be reproduced locally.
+
+Usage:
+    python generate_data.py --applications 1000000 --courses 60 --seed 42
+    python generate_data.py --applications 50000 --reset
+
+Synthetic staff numbers start with "SYN" so they never clash with real ones.
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+from sqlalchemy import delete, func, insert, select
+
+from database import engine, Base, SessionLocal
+import crud
+from models import Application, ApplicationSearchIndex, Course, CourseModeQuota, CourseCategoryEnum, ModeOfStudyEnum
+
+STAFF_PREFIX = "SYN"
+# Fixed so that a seed reproduces the same dates whenever it is run
+LAST_APPLICATION_DATE = date(2025, 12, 31)
+
+DIVISIONS = [
+    ("Network Management", 22),
+    ("Customer Service", 18),
+    ("Energy Transmission", 12),
+    ("Regional Operations", 12),
+    ("Finance", 8),
+    ("Information Technology", 7),
+    ("Human Resources", 5),
+    ("Supply Chain", 5),
+    ("Infrastructure Development", 5),
+    ("Legal and Corporate Affairs", 3),
+    ("Internal Audit", 2),
+    ("Strategy and Planning", 1),
+]
+
+DESIGNATIONS = [
+    ("Technician", 20),
+    ("Customer Service Officer", 14),
+    ("Engineer", 12),
+    ("Artisan", 10),
+    ("Clerical Officer", 9),
+    ("Senior Engineer", 7),
+    ("Accountant", 6),
+    ("Supervisor", 6),
+    ("ICT Officer", 5),
+    ("Procurement Officer", 4),
+    ("Human Resource Officer", 3),
+    ("Manager", 3),
+    ("Senior Manager", 1),
+]
+
+MODES = [
+    (ModeOfStudyEnum.ONLINE, 45),
+    (ModeOfStudyEnum.BLENDED, 35),
+    (ModeOfStudyEnum.PHYSICAL, 20),
+]
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Grace", "Peter", "Faith", "David", "Mercy",
+    "Joseph", "Esther", "Daniel", "Lucy", "Samuel", "Ann", "Brian", "Joyce",
+    "Kevin", "Caroline", "Dennis", "Winnie", "Collins", "Purity", "Victor",
+    "Sharon", "Wanjiru", "Akinyi", "Kiprono", "Njeri", "Otieno", "Chebet",
+]
+
+LAST_NAMES = [
+    "Kamau", "Otieno", "Wanjiku", "Mwangi", "Ochieng", "Njoroge", "Kiprop",
+    "Wambui", "Mutua", "Achieng", "Kariuki", "Omondi", "Chepkoech", "Maina",
+    "Kimani", "Odhiambo", "Mohamed", "Wafula", "Nyambura", "Cheruiyot",
+    "Onyango", "Muthoni", "Barasa", "Koech", "Kilonzo", "Ndungu",
+]
+
+SHORT_TOPICS = [
+    "Project Management", "Leadership", "Electrical Safety", "Customer Service",
+    "Digital Transformation", "Financial Management", "Data Analytics",
+    "Contract Management", "Occupational Health", "Public Procurement",
+    "Cyber Security Awareness", "Renewable Energy Systems", "Metering Technology",
+]
+SHORT_LEVELS = ["Fundamentals", "Intermediate", "Advanced", "Masterclass"]
+
+ACADEMIC_PROGRAMMES = [
+    "Electrical Engineering", "Business Administration", "Accounting",
+    "Energy Management", "Information Technology", "Power Systems",
+    "Environmental Science", "Electrical Installation", "Supply Chain Management",
+    "Human Resource Management", "Data Science", "Civil Engineering",
+]
+ACADEMIC_LEVELS = ["Diploma in", "Bachelor of Science in", "Master of Science in"]
+
+
+def _weighted(pairs):
+    values, weights = zip(*pairs)
+    return list(values), list(weights)
+
+
+def generate_courses(rng: random.Random, count: int):
+    """Course rows, roughly 60% short professional and 40% academic"""
+    rows = []
+    for i in range(count):
+        if rng.random() < 0.6:
+            name = f"{rng.choice(SHORT_TOPICS)} {rng.choice(SHORT_LEVELS)}"
+            category = CourseCategoryEnum.SHORT_PROFESSIONAL
+        else:
+            name = f"{rng.choice(ACADEMIC_LEVELS)} {rng.choice(ACADEMIC_PROGRAMMES)}"
+            category = CourseCategoryEnum.ACADEMIC
+        rows.append({
+            "name": f"{name} (Cohort {i + 1})",
+            "category": category,
+            "description": f"Synthetic {category.value.replace('_', ' ')} course",
+            "is_active": True,
+        })
+    return rows
+
+
+def generate_applications(rng: random.Random, courses, count: int, start: int, batch_size: int):
+    """
+    Yield batches of application rows.
+
+    Course popularity follows a Zipf-like curve so a handful of courses
+    attract most applicants, which is what hot spots look like in production.
+    Every column is drawn per batch with ``rng.choices`` to keep generation
+    cheap compared to the insert itself.
+    """
+    course_weights = [1 / (rank + 1) ** 1.1 for rank in range(len(courses))]
+    courses = list(courses)
+    rng.shuffle(courses)
+    divisions, division_weights = _weighted(DIVISIONS)
+    designations, designation_weights = _weighted(DESIGNATIONS)
+    modes, mode_weights = _weighted(MODES)
+    first_day = LAST_APPLICATION_DATE - timedelta(days=365)
+
+    for offset in range(0, count, batch_size):
+        n = min(batch_size, count - offset)
+        picked_courses = rng.choices(courses, course_weights, k=n)
+        picked_divisions = rng.choices(divisions, division_weights, k=n)
+        picked_designations = rng.choices(designations, designation_weights, k=n)
+        picked_modes = rng.choices(modes, mode_weights, k=n)
+        first_names = rng.choices(FIRST_NAMES, k=n)
+        last_names = rng.choices(LAST_NAMES, k=n)
+        days = rng.choices(range(366), k=n)
+        seconds = rng.choices(range(8 * 3600, 18 * 3600), k=n)
+
+        batch = []
+        for j in range(n):
+            index = start + offset + j
+            course_id, category = picked_courses[j]
+            application_date = first_day + timedelta(days=days[j])
+            batch.append({
+                "staff_number": f"{STAFF_PREFIX}{index:07d}",
+                "email": f"{first_names[j]}.{last_names[j]}{index}@kplc.co.ke".lower(),
+                "application_date": application_date,
+                "first_name": first_names[j],
+                "last_name": last_names[j],
+                "designation": picked_designations[j],
+                "division": picked_divisions[j],
+                "course_category": category,
+                "course_id": course_id,
+                "mode_of_study": picked_modes[j],
+                "created_at": datetime.combine(application_date, dt_time()) + timedelta(seconds=seconds[j]),
+            })
+        yield batch
+
+
+def load(num_courses: int, num_applications: int, seed: int, batch_size: int, reset: bool):
+    rng = random.Random(seed)
+    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        if reset:
+            print("Deleting existing applications and courses...")
+            conn.execute(delete(ApplicationSearchIndex))
+            conn.execute(delete(Application))
+            conn.execute(delete(CourseModeQuota))
+            conn.execute(delete(Course))
+
+        if num_courses:
+            conn.execute(insert(Course), generate_courses(rng, num_courses))
+            print(f"✓ Inserted {num_courses} courses")
+
+        courses = conn.execute(
+            select(Course.id, Course.category).where(Course.is_active == True).order_by(Course.id)
+        ).all()
+        if num_applications and not courses:
+            raise SystemExit("✗ No active courses to apply for; pass --courses")
+
+        # Continue numbering after earlier synthetic runs instead of colliding
+        start = conn.execute(
+            select(func.count()).select_from(Application).where(Application.staff_number.like(f"{STAFF_PREFIX}%"))
+        ).scalar_one()
+
+        loaded = 0
+        for batch in generate_applications(rng, courses, num_applications, start, batch_size):
+            conn.execute(insert(Application), batch)
+            loaded += len(batch)
+            print(f"  {loaded:>9,} / {num_applications:,} applications", end="\r")
+
+    # Bulk inserts bypass crud, so bring the seat counters and the search
+    # index back in line
+    db = SessionLocal()
+    try:
+        crud.recount_seats(db)
+        crud.rebuild_search_index(db)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✓ Loaded {num_applications:,} applications in {elapsed:.1f}s "
+          f"({num_applications / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic courses and applications")
+    parser.add_argument("--courses", type=int, default=40, help="number of courses to create (default: 40)")
+    parser.add_argument("--applications", type=int, default=10000, help="number of applications to create (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="rows per insert batch (default: 10000)")
+    parser.add_argument("--reset", action="store_true", help="delete ALL applications and courses first")
+    args = parser.parse_args()
+
+    load(args.courses, args.applications, args.seed, args.batch_size, args.reset)
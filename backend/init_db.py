@@ -5,10 +5,14 @@ This script:
 1. Creates all database tables
 2. Seeds sample courses for testing
 3. Initializes form status
+4. Builds the application search index for existing applications
+5. Recounts course seats from the applications already submitted
 """
 
 from database import engine, SessionLocal, Base
-from models import Course, FormStatus, CourseCategoryEnum
+from sqlalchemy import insert
+from models import Course, Application, ApplicationSearchIndex, FormStatus, CourseCategoryEnum
+import crud
 from datetime import datetime
 
 
@@ -115,11 +119,9 @@ def seed_courses():
             },
         ]
         
-        # Add all courses
+        # Add all courses in a single bulk insert
         all_courses = short_professional_courses + academic_courses
-        for course_data in all_courses:
-            course = Course(**course_data)
-            db.add(course)
+        db.execute(insert(Course), all_courses)
         
         db.commit()
         print(f"✓ Successfully seeded {len(all_courses)} courses")
@@ -157,6 +159,44 @@ def init_form_status():
         db.close()
 
 
+def build_search_index():
+    """Index applications that predate the search index"""
+    db = SessionLocal()
+    
+    try:
+        applications = db.query(Application).count()
+        indexed = db.query(ApplicationSearchIndex).count()
+        if applications == indexed:
+            print(f"✓ Search index up to date ({indexed} applications)")
+            return
+        
+        print("Building application search index...")
+        indexed = crud.rebuild_search_index(db)
+        print(f"✓ Indexed {indexed} applications")
+        
+    except Exception as e:
+        print(f"✗ Error building search index: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def recount_seats():
+    """Bring seat counters in line with existing applications"""
+    db = SessionLocal()
+    
+    try:
+        print("Recounting course seats...")
+        crud.recount_seats(db)
+        print("✓ Seat counters match existing applications")
+        
+    except Exception as e:
+        print(f"✗ Error recounting seats: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 if __name__ == "__main__":
     print("\n" + "="*60)
     print("Kenya Power Staff Application Form - Database Setup")
@@ -165,6 +205,8 @@ if __name__ == "__main__":
     init_db()
     seed_courses()
     init_form_status()
+    build_search_index()
+    recount_seats()
     
     print("\n" + "="*60)
     print("Database initialization complete!")
@@ -3,7 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
 
-from routers import courses, applications, form_status
+from routers import courses, applications, form_status, diagnostics
+import profiling
+import slow_queries
+from compression import CompressionMiddleware
 
 load_dotenv()
 
@@ -13,6 +16,14 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Admin-only per-request profiling (X-Profile header) and the slow-query log;
+# registered before CORS so their responses still carry the CORS headers
+app.add_middleware(profiling.ProfilingMiddleware)
+app.add_middleware(slow_queries.SlowQueryMiddleware)
+
+# gzip/brotli for larger responses, e.g. the admin list and CSV export
+app.add_middleware(CompressionMiddleware)
+
 # CORS configuration
 origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
 
@@ -28,6 +39,7 @@ app.add_middleware(
 app.include_router(courses.router)
 app.include_router(applications.router)
 app.include_router(form_status.router)
+app.include_router(diagnostics.router)
 
 
 @app.get("/")
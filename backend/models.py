@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, Index, DDL, event, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -24,10 +24,27 @@ class Course(Base):
     category = Column(SQLEnum(CourseCategoryEnum), nullable=False)
     description = Column(String(500))
     is_active = Column(Boolean, default=True)
+    # Optional capacity; seats_taken is maintained by atomic conditional
+    # UPDATEs in crud rather than by locking the course row
+    seat_limit = Column(Integer, nullable=True)
+    seats_taken = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationship
     applications = relationship("Application", back_populates="course")
+    mode_quotas = relationship("CourseModeQuota", back_populates="course", cascade="all, delete-orphan")
+
+
+class CourseModeQuota(Base):
+    __tablename__ = "course_mode_quotas"
+
+    course_id = Column(Integer, ForeignKey("courses.id"), primary_key=True)
+    mode_of_study = Column(SQLEnum(ModeOfStudyEnum), primary_key=True)
+    seat_limit = Column(Integer, nullable=False)
+    seats_taken = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Relationship
+    course = relationship("Course", back_populates="mode_quotas")
 
 
 class Application(Base):
@@ -42,7 +59,7 @@ class Application(Base):
     designation = Column(String(255), nullable=False)
     division = Column(String(255), nullable=False)
     course_category = Column(SQLEnum(CourseCategoryEnum), nullable=False)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False, index=True)
     mode_of_study = Column(SQLEnum(ModeOfStudyEnum), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -50,6 +67,66 @@ class Application(Base):
     course = relationship("Course", back_populates="applications")
 
 
+class ApplicationSearchIndex(Base):
+    """
+    One searchable document per application (names, staff number,
+    designation, division and course name), kept in sync by crud.
+
+    MariaDB searches it through a FULLTEXT index; SQLite mirrors it into the
+    application_search_fts FTS5 table with triggers (see below).
+    """
+    __tablename__ = "application_search_index"
+
+    application_id = Column(Integer, ForeignKey("applications.id"), primary_key=True)
+    document = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index("ix_application_search_document", "document", mysql_prefix="FULLTEXT").ddl_if(dialect=("mysql", "mariadb")),
+    )
+
+
+# SQLite: external-content FTS5 table over application_search_index, with
+# a prefix index for the short, broad prefixes that are otherwise slowest
+SQLITE_SEARCH_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS application_search_fts USING fts5(
+    document,
+    content='application_search_index',
+    content_rowid='application_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2'
+)
+"""
+
+SQLITE_SEARCH_TRIGGERS = {
+    "application_search_ai": """
+        CREATE TRIGGER IF NOT EXISTS application_search_ai AFTER INSERT ON application_search_index BEGIN
+            INSERT INTO application_search_fts(rowid, document) VALUES (new.application_id, new.document);
+        END
+    """,
+    "application_search_ad": """
+        CREATE TRIGGER IF NOT EXISTS application_search_ad AFTER DELETE ON application_search_index BEGIN
+            INSERT INTO application_search_fts(application_search_fts, rowid, document)
+            VALUES ('delete', old.application_id, old.document);
+        END
+    """,
+    "application_search_au": """
+        CREATE TRIGGER IF NOT EXISTS application_search_au AFTER UPDATE ON application_search_index BEGIN
+            INSERT INTO application_search_fts(application_search_fts, rowid, document)
+            VALUES ('delete', old.application_id, old.document);
+            INSERT INTO application_search_fts(rowid, document) VALUES (new.application_id, new.document);
+        END
+    """,
+}
+
+for _statement in [SQLITE_SEARCH_FTS_DDL, *SQLITE_SEARCH_TRIGGERS.values()]:
+    event.listen(ApplicationSearchIndex.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    ApplicationSearchIndex.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS application_search_fts").execute_if(dialect="sqlite"),
+)
+
+
 class FormStatus(Base):
     __tablename__ = "form_status"
 
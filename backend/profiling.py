@@ -0,0 +1,256 @@
+"""
+On-demand per-request profiling for administrators.
+
+Send ``X-Profile: json`` (or ``?_profile=json``) together with the usual
+``X-Admin-Password`` header and the request runs under a sampling profiler
+while every SQL statement it issues is timed. Instead of the normal response
+body the client receives the profile as a downloadable file:
+
+- ``json`` (also ``1`` / ``true``) - stack samples, SQL statements and totals
+- ``collapsed`` - folded stacks, ready for flamegraph.pl or speedscope
+
+``0``, ``false`` or an empty value leave the request unprofiled; any other
+value is rejected with 400.
+
+Example:
+
+    curl -H "X-Admin-Password: ..." -H "X-Profile: collapsed" \\
+        http://localhost:8000/api/applications/export -o export.folded
+
+Requests without the flag pay for a scan of the raw request headers before
+being passed straight to the app, and for a ContextVar lookup per SQL
+statement. The sampler thread only runs while a profiled request does. If
+the endpoint raises, the profile is still returned, with ``status_code`` 500
+and the exception in ``error``.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import event
+
+import auth
+from database import engine
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAM = "_profile"
+PROFILE_HEADER_BYTES = PROFILE_HEADER.encode("latin-1")
+PROFILE_QUERY_BYTES = f"{PROFILE_QUERY_PARAM}=".encode("latin-1")
+# Accepted flag values and the output format each selects; "0", "false" or
+# an empty value leave profiling off
+PROFILE_FORMATS = {"json": "json", "1": "json", "true": "json", "collapsed": "collapsed"}
+PROFILE_OFF = {"", "0", "false"}
+SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "1"))
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+
+def _is_app_frame(filename: str) -> bool:
+    """True for frames from this backend's own source, not its dependencies"""
+    return filename.startswith(_APP_DIR) and "site-packages" not in filename
+
+
+def _fold_stack(frame) -> Optional[str]:
+    """
+    Render a frame chain as a folded stack (root first, ``;`` separated).
+
+    Returns None for stacks that never enter application code, e.g. idle
+    worker threads or the event loop waiting on its selector.
+    """
+    frames = []
+    in_app = False
+    while frame is not None:
+        code = frame.f_code
+        in_app = in_app or _is_app_frame(code.co_filename)
+        frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    if not in_app:
+        return None
+    return ";".join(reversed(frames))
+
+
+class RequestProfile:
+    """Stack samples and SQL timings collected for a single request"""
+
+    def __init__(self, interval_ms: float = SAMPLE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.samples = Counter()
+        self.statements = []
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _sample(self):
+        # The endpoint may run on the event loop or on any threadpool worker,
+        # so every thread is sampled and only stacks in app code are kept.
+        # Concurrent requests on the same worker will show up as well.
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _fold_stack(frame)
+                if stack is None:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                self.samples[f"{names.get(thread_id, thread_id)};{stack}"] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self, request: Request, status_code: int, response_bytes: int) -> dict:
+        sql_total = sum(s["duration_ms"] for s in self.statements)
+        return {
+            "method": request.method,
+            "path": request.url.path,
+            "query": str(request.url.query),
+            "status_code": status_code,
+            "response_bytes": response_bytes,
+            "duration_ms": round(self.duration * 1000, 3),
+            "sample_interval_ms": self.interval * 1000,
+            "sample_count": sum(self.samples.values()),
+            "sql": {
+                "count": len(self.statements),
+                "total_ms": round(sql_total, 3),
+                "statements": self.statements,
+            },
+            "stacks": [
+                {"stack": stack, "samples": count}
+                for stack, count in self.samples.most_common()
+            ],
+        }
+
+
+# Registered once, like the slow-query listeners: adding and removing
+# listeners per request would mutate the engine's listener list while other
+# requests are running statements. Unprofiled statements pay for one
+# ContextVar lookup.
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_profile.get() is not None:
+        # Kept on the execution context, so a failing statement leaves
+        # nothing behind on the pooled connection
+        context._profile_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = getattr(context, "_profile_start", None)
+    if profile is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    profile.statements.append({
+        "statement": statement,
+        "parameters": repr(parameters),
+        "executemany": executemany,
+        "rowcount": cursor.rowcount,
+        "duration_ms": round(elapsed * 1000, 3),
+    })
+
+
+def _profile_mode(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER_BYTES:
+            return value.decode("latin-1").strip().lower()
+    query_string = scope.get("query_string", b"")
+    if PROFILE_QUERY_BYTES in query_string:
+        values = parse_qs(query_string.decode("latin-1")).get(PROFILE_QUERY_PARAM)
+        if values:
+            return values[0].strip().lower()
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a request when the admin asks for it.
+
+    Unflagged requests are handed straight to the app after a scan of the
+    request headers, with no extra task or body re-streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = _profile_mode(scope) if scope["type"] == "http" else None
+        if mode is None or mode in PROFILE_OFF:
+            await self.app(scope, receive, send)
+            return
+        if mode not in PROFILE_FORMATS:
+            response = JSONResponse(status_code=400, content={
+                "detail": f"Unknown profile format '{mode}'. Use one of: {', '.join(PROFILE_FORMATS)}"
+            })
+            await response(scope, receive, send)
+            return
+
+        request = Request(scope)
+        try:
+            auth.verify_admin(request.headers.get("x-admin-password"))
+        except HTTPException as e:
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await response(scope, receive, send)
+            return
+
+        status = {"code": None, "bytes": 0, "error": None}
+
+        async def capture(message):
+            # The real response is replaced by the profile, so only measure it
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                status["bytes"] += len(message.get("body", b""))
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, capture)
+        except Exception as e:
+            status["code"] = 500
+            status["error"] = repr(e)
+        finally:
+            profile.stop()
+            _current_profile.reset(token)
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        if PROFILE_FORMATS[mode] == "collapsed":
+            response = Response(
+                content=profile.collapsed(),
+                media_type="text/plain",
+                headers={"Content-Disposition": f"attachment; filename=profile-{stamp}.folded"},
+            )
+        else:
+            summary = profile.summary(request, status["code"], status["bytes"])
+            summary["error"] = status["error"]
+            response = Response(
+                content=json.dumps(summary, indent=2),
+                media_type="application/json",
+                headers={"Content-Disposition": f"attachment; filename=profile-{stamp}.json"},
+            )
+        await response(scope, receive, send)
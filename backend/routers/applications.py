@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import date
+from enum import Enum
+from typing import List, Optional, Union
 from database import get_db
 import crud
 import schemas
@@ -9,6 +12,16 @@ import auth
 router = APIRouter(prefix="/api/applications", tags=["applications"])
 
 
+def _json_value(value):
+    # Projected rows only hold plain columns, so this is all jsonable_encoder
+    # would do for them, at a fraction of the cost on large tables
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
 @router.post("/", response_model=schemas.ApplicationResponse)
 def submit_application(
     application: schemas.ApplicationCreate,
@@ -87,8 +100,15 @@ def validate_staff_number(staff_number: str, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/", response_model=List[schemas.ApplicationResponse])
+@router.get(
+    "/",
+    response_model=List[schemas.ApplicationResponse],
+    # Documents the ?fields= rows as well; only response_model is validated,
+    # so the full list is not checked against both models
+    responses={200: {"model": Union[List[schemas.ApplicationResponse], List[schemas.ApplicationFields]]}},
+)
 def get_all_applications(
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
     authorized: bool = Depends(auth.verify_admin)
 ):
@@ -96,11 +116,54 @@ def get_all_applications(
     Get all applications (admin only).
     
     Returns all submitted applications with course details.
+    
+    - **fields**: Optional comma-separated list of columns to return instead,
+      e.g. `id,staff_number,first_name,last_name,course_name`. Only those
+      columns are read from the database, and each row is an ApplicationFields
+      object holding just those keys.
     """
+    if fields:
+        requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        unknown = [field for field in requested if field not in crud.APPLICATION_FIELDS]
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(crud.APPLICATION_FIELDS)}"
+            )
+        rows = crud.get_application_fields(db, requested)
+        return JSONResponse(content=[
+            {field: _json_value(value) for field, value in row.items()} for row in rows
+        ])
+
     applications = crud.get_all_applications(db)
     return applications
 
 
+@router.get("/search", response_model=schemas.ApplicationSearchResponse)
+def search_applications(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(25, ge=1, le=100),
+    db: Session = Depends(get_db),
+    authorized: bool = Depends(auth.verify_admin)
+):
+    """
+    Search applications (admin only).
+    
+    - **q**: Words to find; each matches the start of a word in the first or
+      last name, staff number, designation, division or course name
+    - **page**, **page_size**: Pagination, best matches first
+    """
+    total, results = crud.search_applications(db, q, limit=page_size, offset=(page - 1) * page_size)
+    return schemas.ApplicationSearchResponse(
+        query=q,
+        total=total,
+        page=page,
+        page_size=page_size,
+        results=results
+    )
+
+
 @router.get("/export")
 def export_applications_csv(
     db: Session = Depends(get_db),
@@ -5,6 +5,7 @@ from database import get_db
 from models import CourseCategoryEnum
 import crud
 import schemas
+import auth
 
 router = APIRouter(prefix="/api/courses", tags=["courses"])
 
@@ -46,3 +47,35 @@ def create_course(course: schemas.CourseCreate, db: Session = Depends(get_db)):
     - **description**: Optional course description
     """
     return crud.create_course(db, course)
+
+
+@router.get("/{course_id}/quota", response_model=schemas.CourseQuotaResponse)
+def get_course_quota(course_id: int, db: Session = Depends(get_db)):
+    """
+    Get seat limits and seats taken for a course and each mode of study.
+    
+    - **course_id**: The ID of the course
+    """
+    course = crud.get_course_by_id(db, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return crud.get_course_quota(db, course)
+
+
+@router.put("/{course_id}/quota", response_model=schemas.CourseQuotaResponse)
+def set_course_quota(
+    course_id: int,
+    quota: schemas.CourseQuotaUpdate,
+    db: Session = Depends(get_db),
+    authorized: bool = Depends(auth.verify_admin)
+):
+    """
+    Set seat limits for a course (admin only).
+    
+    - **seat_limit**: Maximum applications for the course, or null for no limit; omit to keep the current limit
+    - **mode_seat_limits**: Optional per-mode limits, e.g. {"physical": 30}; null removes a limit
+    """
+    course = crud.get_course_by_id(db, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return crud.set_course_quota(db, course, quota)
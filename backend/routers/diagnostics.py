@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+import schemas
+import auth
+import slow_queries
+
+router = APIRouter(prefix="/api/diagnostics", tags=["diagnostics"])
+
+
+@router.get("/slow-queries", response_model=List[schemas.SlowQueryRecord])
+def get_slow_queries(
+    kind: Optional[str] = Query(None, pattern="^(slow|n_plus_one)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    authorized: bool = Depends(auth.verify_admin)
+):
+    """
+    Get the most recent slow queries and N+1 warnings (admin only).
+    
+    - **kind**: Optional filter, either `slow` or `n_plus_one`
+    - **limit**: Maximum number of records to return, newest first
+    """
+    return slow_queries.get_recent(kind=kind, limit=limit)
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries(authorized: bool = Depends(auth.verify_admin)):
+    """
+    Clear the in-memory slow-query buffer (admin only). The log file is kept.
+    """
+    slow_queries.clear()
+    return {"message": "Slow-query buffer cleared"}
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conint
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from models import CourseCategoryEnum, ModeOfStudyEnum
 
 
@@ -10,6 +10,7 @@ class CourseBase(BaseModel):
     category: CourseCategoryEnum
     description: Optional[str] = None
     is_active: bool = True
+    seat_limit: Optional[int] = Field(None, ge=0)
 
 
 class CourseCreate(CourseBase):
@@ -18,12 +19,37 @@ class CourseCreate(CourseBase):
 
 class CourseResponse(CourseBase):
     id: int
+    seats_taken: int = 0
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+# Seat Quota Schemas
+class CourseQuotaUpdate(BaseModel):
+    # Left unchanged when omitted; null removes the limit
+    seat_limit: Optional[int] = Field(None, ge=0)
+    # Per-mode limits; a mode mapped to None has its limit removed
+    mode_seat_limits: Dict[ModeOfStudyEnum, Optional[conint(ge=0)]] = {}
+
+
+class ModeQuotaResponse(BaseModel):
+    mode_of_study: ModeOfStudyEnum
+    seat_limit: int
+    seats_taken: int
+
+    class Config:
+        from_attributes = True
+
+
+class CourseQuotaResponse(BaseModel):
+    course_id: int
+    seat_limit: Optional[int] = None
+    seats_taken: int
+    mode_quotas: List[ModeQuotaResponse] = []
+
+
 # Application Schemas
 class ApplicationBase(BaseModel):
     staff_number: str = Field(..., min_length=1, max_length=50)
@@ -51,6 +77,31 @@ class ApplicationResponse(ApplicationBase):
         from_attributes = True
 
 
+class ApplicationFields(BaseModel):
+    """Row of GET /api/applications/?fields=..., holding only the requested columns"""
+    id: Optional[int] = None
+    staff_number: Optional[str] = None
+    email: Optional[str] = None
+    application_date: Optional[date] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    designation: Optional[str] = None
+    division: Optional[str] = None
+    course_category: Optional[CourseCategoryEnum] = None
+    course_id: Optional[int] = None
+    mode_of_study: Optional[ModeOfStudyEnum] = None
+    created_at: Optional[datetime] = None
+    course_name: Optional[str] = None
+
+
+class ApplicationSearchResponse(BaseModel):
+    query: str
+    total: int
+    page: int
+    page_size: int
+    results: List[ApplicationResponse]
+
+
 # Form Status Schemas
 class FormStatusResponse(BaseModel):
     id: int
@@ -72,3 +123,15 @@ class StaffValidationResponse(BaseModel):
     staff_number: str
     has_applied: bool
     application: Optional[ApplicationResponse] = None
+
+
+# Diagnostics Schemas
+class SlowQueryRecord(BaseModel):
+    kind: str  # "slow" or "n_plus_one"
+    timestamp: datetime
+    route: Optional[str] = None
+    statement: str
+    duration_ms: Optional[float] = None
+    count: int = 1
+    parameters: Optional[Any] = None  # parameter types only, never values
+    plan: Optional[List[str]] = None
@@ -0,0 +1,202 @@
+"""
+Slow-query log and N+1 detection.
+
+Every statement executed through the engine is timed. Statements slower than
+``SLOW_QUERY_MS`` are recorded with the route that issued them, the shape of
+their parameters (types only, never values) and an ``EXPLAIN`` plan captured
+on the same connection. Within a request, identical SELECT statements
+repeated ``N_PLUS_ONE_THRESHOLD`` times or more are flagged as a likely N+1.
+
+Records go to a rotating log file (``SLOW_QUERY_LOG``, one JSON object per
+line) and to an in-memory buffer served by ``GET /api/diagnostics/slow-queries``.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from database import engine
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "5"))
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+EXPLAINABLE = ("select", "update", "delete")
+
+logger = logging.getLogger("slow_queries")
+logger.setLevel(logging.WARNING)
+logger.propagate = False
+if SLOW_QUERY_LOG:
+    _handler = RotatingFileHandler(
+        SLOW_QUERY_LOG,
+        maxBytes=SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=SLOW_QUERY_LOG_BACKUPS,
+        delay=True,
+    )
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+else:
+    # Without a handler logging would fall back to printing on stderr
+    logger.addHandler(logging.NullHandler())
+
+_recent = deque(maxlen=SLOW_QUERY_BUFFER)
+_recent_lock = threading.Lock()
+
+
+class RequestQueryStats:
+    """Statement counts for the request currently being served"""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.counts = Counter()
+
+    @property
+    def route(self) -> str:
+        # Prefer the route template once routing has happened, so records
+        # group by endpoint rather than by staff number in the path
+        route = self.scope.get("route")
+        path = getattr(route, "path", None) or self.scope.get("path", "")
+        return f"{self.scope.get('method', '')} {path}"
+
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def _shape(parameters):
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _parameters_shape(parameters, executemany: bool):
+    """Describe bound parameters by type so no applicant data reaches the log"""
+    if executemany:
+        return {"rows": len(parameters), "row": _shape(parameters[0]) if parameters else None}
+    return _shape(parameters)
+
+
+def _explain(cursor, statement: str, parameters, dialect_name: str) -> List[str]:
+    """
+    Run EXPLAIN for a statement on the DBAPI connection that just executed it.
+
+    Goes through the raw cursor so the EXPLAIN itself does not fire engine
+    events (and cannot be logged as slow in turn).
+    """
+    prefix = "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(prefix + statement, parameters)
+        columns = [column[0] for column in explain_cursor.description or ()]
+        rows = [" | ".join(str(value) for value in row) for row in explain_cursor.fetchall()]
+        return [" | ".join(columns)] + rows
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        explain_cursor.close()
+
+
+def _record(entry: dict):
+    entry["timestamp"] = datetime.now().isoformat()
+    with _recent_lock:
+        _recent.append(entry)
+    logger.warning(json.dumps(entry, default=str))
+
+
+def get_recent(kind: Optional[str] = None, limit: int = 100) -> List[dict]:
+    """Most recent records first, optionally only "slow" or "n_plus_one" ones"""
+    with _recent_lock:
+        entries = list(_recent)
+    if kind:
+        entries = [entry for entry in entries if entry["kind"] == kind]
+    return entries[::-1][:limit]
+
+
+def clear():
+    with _recent_lock:
+        _recent.clear()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than conn.info: when a statement
+    # fails, after_cursor_execute never runs and conn.info lives on with the
+    # pooled connection
+    if context is not None:
+        context._slow_query_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_start", None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.counts[statement] += 1
+
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+
+    plan = None
+    streaming = context is not None and context.execution_options.get("stream_results")
+    if not executemany and not streaming and statement.lstrip().lower().startswith(EXPLAINABLE):
+        plan = _explain(cursor, statement, parameters, conn.dialect.name)
+
+    _record({
+        "kind": "slow",
+        "route": stats.route if stats is not None else None,
+        "statement": statement,
+        "duration_ms": round(elapsed_ms, 3),
+        "count": 1,
+        "parameters": _parameters_shape(parameters, executemany),
+        "plan": plan,
+    })
+
+
+class SlowQueryMiddleware:
+    """
+    ASGI middleware that attributes statements to the request issuing them
+    and reports repeated identical SELECTs (N+1) once the response is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope)
+        token = _request_stats.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_stats.reset(token)
+            for statement, count in stats.counts.items():
+                if count >= N_PLUS_ONE_THRESHOLD and statement.lstrip().lower().startswith("select"):
+                    _record({
+                        "kind": "n_plus_one",
+                        "route": stats.route,
+                        "statement": statement,
+                        "duration_ms": None,
+                        "count": count,
+                        "parameters": None,
+                        "plan": None,
+                    })
@@ -0,0 +1,135 @@
+"""
+Shared fixtures: a seeded SQLite database, a FastAPI test client and a
+statement counter for query-budget assertions.
+
+The environment is configured before any backend module is imported, since
+database.py builds its engine from DATABASE_URL at import time.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date
+
+_tmp_dir = tempfile.mkdtemp(prefix="iesrform-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ["SLOW_QUERY_LOG"] = ""
+os.environ["SQL_ECHO"] = "false"
+os.environ["ADMIN_PASSWORD"] = "test-admin"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from database import Base, SessionLocal, engine
+from models import Application, Course, ModeOfStudyEnum
+import init_db
+import main
+
+ADMIN_HEADERS = {"X-Admin-Password": "test-admin"}
+
+
+class QueryCounter:
+    """Records every statement the engine sends to the database"""
+
+    def __init__(self):
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def report(self) -> str:
+        return "\n".join(
+            f"  [{i}] {' '.join(statement.split())}"
+            for i, statement in enumerate(self.statements, start=1)
+        )
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._before_cursor_execute)
+
+
+def assert_query_budget(counter: QueryCounter, budget: int, label: str):
+    """Fail with the offending statements when a budget is exceeded"""
+    assert counter.count <= budget, (
+        f"{label} executed {counter.count} statements, budget is {budget}:\n"
+        f"{counter.report()}"
+    )
+
+
+@pytest.fixture
+def db_session():
+    """A freshly created and seeded database for every test"""
+    Base.metadata.drop_all(bind=engine)
+    init_db.init_db()
+    init_db.seed_courses()
+    init_db.init_form_status()
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(db_session):
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def courses(db_session):
+    return db_session.query(Course).order_by(Course.id).all()
+
+
+@pytest.fixture
+def make_applications(db_session, courses):
+    """Insert ``n`` applications spread over every seeded course"""
+
+    def _make(n: int, prefix: str = "KP"):
+        rows = [
+            {
+                "staff_number": f"{prefix}{i:05d}",
+                "application_date": date(2025, 1, 1),
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "designation": "Engineer",
+                "division": "Operations",
+                "course_category": courses[i % len(courses)].category,
+                "course_id": courses[i % len(courses)].id,
+                "mode_of_study": ModeOfStudyEnum.ONLINE,
+            }
+            for i in range(n)
+        ]
+        if rows:
+            db_session.execute(insert(Application), rows)
+            db_session.commit()
+        return rows
+
+    return _make
+
+
+def application_payload(course: Course, staff_number: str = "KP99999", **overrides) -> dict:
+    payload = {
+        "staff_number": staff_number,
+        "application_date": "2025-01-01",
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "designation": "Engineer",
+        "division": "Operations",
+        "course_category": course.category.value,
+        "course_id": course.id,
+        "mode_of_study": ModeOfStudyEnum.ONLINE.value,
+    }
+    payload.update(overrides)
+    return payload
@@ -0,0 +1,91 @@
+"""
+Admin payload size: ?fields= column projection on the applications list and
+negotiated gzip/brotli compression of larger responses.
+"""
+
+import gzip
+
+import crud
+import schemas
+from conftest import ADMIN_HEADERS, count_queries
+
+
+def get_applications(client, **params):
+    return client.get("/api/applications/", params=params, headers=ADMIN_HEADERS)
+
+
+def test_fields_projection_reads_only_requested_columns(client, make_applications):
+    make_applications(3)
+    with count_queries() as counter:
+        response = get_applications(client, fields="id,staff_number,mode_of_study")
+    assert response.status_code == 200, response.text
+    assert response.json()[0] == {"id": 1, "staff_number": "KP00000", "mode_of_study": "online"}
+
+    assert counter.count == 1
+    statement = counter.statements[0]
+    assert "courses" not in statement
+    assert "first_name" not in statement
+
+
+def test_fields_projection_joins_course_only_when_asked(client, courses, make_applications):
+    make_applications(2)
+    with count_queries() as counter:
+        response = get_applications(client, fields="staff_number,course_name,application_date")
+    assert response.status_code == 200, response.text
+    assert response.json()[1] == {
+        "staff_number": "KP00001",
+        "course_name": courses[1].name,
+        "application_date": "2025-01-01",
+    }
+    assert counter.count == 1
+    assert "JOIN courses" in counter.statements[0]
+
+
+def test_unknown_field_is_rejected(client):
+    response = get_applications(client, fields="id,password")
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+
+def test_without_fields_returns_full_applications(client, make_applications):
+    make_applications(1)
+    application = get_applications(client).json()[0]
+    assert application["course"]["name"]
+
+
+def test_fields_projection_is_documented(client):
+    assert set(schemas.ApplicationFields.model_fields) == set(crud.APPLICATION_FIELDS)
+    schema = client.get("/openapi.json").json()["paths"]["/api/applications/"]["get"]["responses"]["200"]
+    items = [variant["items"]["$ref"] for variant in schema["content"]["application/json"]["schema"]["anyOf"]]
+    assert items == ["#/components/schemas/ApplicationResponse", "#/components/schemas/ApplicationFields"]
+
+
+def test_large_response_is_gzipped(client, make_applications):
+    make_applications(50)
+    response = client.get("/api/applications/", headers={**ADMIN_HEADERS, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 50
+
+
+def test_brotli_preferred_when_accepted(client, make_applications):
+    make_applications(50)
+    response = client.get("/api/applications/", headers={**ADMIN_HEADERS, "Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert len(response.json()) == 50
+
+
+def test_streamed_export_is_compressed(client, make_applications):
+    make_applications(50)
+    with client.stream("GET", "/api/applications/export", headers={**ADMIN_HEADERS, "Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    assert len(gzip.decompress(raw).decode().strip().splitlines()) == 51
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(client, make_applications):
+    assert "content-encoding" not in client.get("/health", headers={"Accept-Encoding": "gzip"}).headers
+
+    make_applications(50)
+    response = client.get("/api/applications/", headers={**ADMIN_HEADERS, "Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,89 @@
+"""
+On-demand request profiling: admin-only, captures SQL and stack samples, and
+still returns a profile when the endpoint fails.
+"""
+
+import re
+import time
+
+import pytest
+from sqlalchemy import select
+
+import crud
+from conftest import ADMIN_HEADERS
+from models import Application
+
+
+def slow_get_all_applications(original):
+    # Keep the endpoint busy long enough for the sampler to see it
+    def wrapper(db):
+        time.sleep(0.05)
+        return original(db)
+    return wrapper
+
+
+def test_profile_requires_admin(client):
+    response = client.get("/api/applications/", headers={"X-Profile": "json"})
+    assert response.status_code == 401
+
+
+def test_json_profile_captures_sql(client, make_applications):
+    make_applications(5)
+    response = client.get("/api/applications/", headers={**ADMIN_HEADERS, "X-Profile": "json"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-disposition"].endswith(".json")
+
+    profile = response.json()
+    assert profile["path"] == "/api/applications/"
+    assert profile["status_code"] == 200
+    assert profile["response_bytes"] > 0
+    assert profile["sql"]["count"] == 1
+    assert "FROM applications" in profile["sql"]["statements"][0]["statement"]
+    assert profile["error"] is None
+
+
+def test_collapsed_profile_is_folded_stacks(client, monkeypatch):
+    monkeypatch.setattr(crud, "get_all_applications", slow_get_all_applications(crud.get_all_applications))
+    response = client.get("/api/applications/", params={"_profile": "collapsed"}, headers=ADMIN_HEADERS)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-disposition"].endswith(".folded")
+
+    lines = response.text.splitlines()
+    assert lines
+    for line in lines:
+        assert re.fullmatch(r"\S.*(;.+)+ \d+", line), line
+    assert any("wrapper (test_profiling.py" in line for line in lines)
+
+
+def test_profile_returned_when_endpoint_raises(client, monkeypatch):
+    def broken(db):
+        db.execute(select(Application.id)).all()
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(crud, "get_all_applications", broken)
+    response = client.get("/api/applications/", headers={**ADMIN_HEADERS, "X-Profile": "1"})
+    assert response.status_code == 200, response.text
+    profile = response.json()
+    assert profile["status_code"] == 500
+    assert "boom" in profile["error"]
+    assert profile["sql"]["count"] == 1
+
+
+def test_unflagged_requests_are_untouched(client):
+    response = client.get("/api/courses/", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert "content-disposition" not in response.headers
+
+
+@pytest.mark.parametrize("flag", ["0", "false", ""])
+def test_profile_can_be_switched_off(client, flag):
+    response = client.get("/api/courses/", headers={**ADMIN_HEADERS, "X-Profile": flag})
+    assert response.status_code == 200
+    assert "content-disposition" not in response.headers
+    assert isinstance(response.json(), list)
+
+
+def test_unknown_profile_format_is_rejected(client):
+    response = client.get("/api/courses/", params={"_profile": "jsno"}, headers=ADMIN_HEADERS)
+    assert response.status_code == 400
+    assert "jsno" in response.json()["detail"]
@@ -0,0 +1,100 @@
+"""
+Query budgets for the hot endpoints.
+
+Each endpoint runs against a seeded SQLite database through the test client
+while every statement is counted. List endpoints are measured at several
+table sizes, so a lazy load per row (N+1) blows the budget even when the
+fixed part is unchanged. Raise a budget only together with the change that
+genuinely needs the extra statement.
+"""
+
+from dataclasses import dataclass
+
+import pytest
+
+import crud
+from conftest import ADMIN_HEADERS, application_payload, assert_query_budget, count_queries
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    fixed: int
+    per_row: int = 0
+
+    def allowed(self, rows: int = 0) -> int:
+        return self.fixed + self.per_row * rows
+
+
+BUDGETS = {
+    # form status, duplicate check, course lookup, check for a mode limit,
+    # insert, search document, refresh, course for response (courses
+    # without limits keep no seat counters)
+    "submit_application": QueryBudget(fixed=8),
+    # application with its course
+    "validate_staff_number": QueryBudget(fixed=2),
+    "get_courses": QueryBudget(fixed=1),
+    # applications joined to their course
+    "list_applications": QueryBudget(fixed=1),
+    "export_applications_csv": QueryBudget(fixed=1),
+    # match count, ranked page of ids, applications joined to their course
+    "search_applications": QueryBudget(fixed=3),
+}
+
+ROW_COUNTS = [1, 15, 60]
+
+
+def test_submit_application(client, courses):
+    payload = application_payload(courses[0])
+    with count_queries() as counter:
+        response = client.post("/api/applications/", json=payload)
+    assert response.status_code == 200, response.text
+    assert_query_budget(counter, BUDGETS["submit_application"].allowed(), "submit_application")
+
+
+@pytest.mark.parametrize("has_applied", [False, True])
+def test_validate_staff_number(client, make_applications, has_applied):
+    staff_number = make_applications(1)[0]["staff_number"] if has_applied else "KP-NONE"
+    with count_queries() as counter:
+        response = client.get(f"/api/applications/validate/{staff_number}")
+    assert response.status_code == 200, response.text
+    assert response.json()["has_applied"] is has_applied
+    assert_query_budget(counter, BUDGETS["validate_staff_number"].allowed(), "validate_staff_number")
+
+
+def test_get_courses(client, courses):
+    with count_queries() as counter:
+        response = client.get("/api/courses/")
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == len(courses)
+    assert_query_budget(counter, BUDGETS["get_courses"].allowed(), "get_courses")
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_list_applications(client, make_applications, rows):
+    make_applications(rows)
+    with count_queries() as counter:
+        response = client.get("/api/applications/", headers=ADMIN_HEADERS)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == rows
+    assert_query_budget(counter, BUDGETS["list_applications"].allowed(rows), f"list_applications ({rows} rows)")
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_export_applications_csv(client, make_applications, rows):
+    make_applications(rows)
+    with count_queries() as counter:
+        response = client.get("/api/applications/export", headers=ADMIN_HEADERS)
+    assert response.status_code == 200, response.text
+    assert len(response.text.strip().splitlines()) == rows + 1
+    assert_query_budget(counter, BUDGETS["export_applications_csv"].allowed(rows), f"export_applications_csv ({rows} rows)")
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_search_applications(client, db_session, make_applications, rows):
+    make_applications(rows)
+    crud.rebuild_search_index(db_session)
+    with count_queries() as counter:
+        response = client.get("/api/applications/search", params={"q": "first"}, headers=ADMIN_HEADERS)
+    assert response.status_code == 200, response.text
+    assert response.json()["total"] == rows
+    assert_query_budget(counter, BUDGETS["search_applications"].allowed(rows), f"search_applications ({rows} rows)")
@@ -0,0 +1,108 @@
+"""
+Admin application search: prefix and token matching across fields, ranking,
+pagination and keeping the index in sync on create and update.
+"""
+
+import crud
+from conftest import ADMIN_HEADERS, application_payload
+
+
+def search(client, q, **params):
+    response = client.get("/api/applications/search", params={"q": q, **params}, headers=ADMIN_HEADERS)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def staff_numbers(result):
+    return [application["staff_number"] for application in result["results"]]
+
+
+def test_search_requires_admin(client):
+    assert client.get("/api/applications/search", params={"q": "jane"}).status_code == 401
+
+
+def test_search_matches_prefixes_across_fields(client, courses):
+    client.post("/api/applications/", json=application_payload(
+        courses[0], "KP1001", first_name="Wanjiru", last_name="Kamau", designation="Technician", division="Finance"))
+    client.post("/api/applications/", json=application_payload(
+        courses[1], "KP2002", first_name="Otieno", last_name="Mwangi", designation="Accountant", division="Supply Chain"))
+
+    assert staff_numbers(search(client, "wanj")) == ["KP1001"]
+    assert staff_numbers(search(client, "KP20")) == ["KP2002"]
+    assert staff_numbers(search(client, "accoun")) == ["KP2002"]
+    assert staff_numbers(search(client, "supply")) == ["KP2002"]
+    assert staff_numbers(search(client, courses[0].name.split()[0].lower())) == ["KP1001"]
+    # All tokens must match
+    assert staff_numbers(search(client, "wanjiru mwangi")) == []
+    assert search(client, "kp")["total"] == 2
+
+
+def test_search_ranks_and_paginates(client, courses):
+    for i in range(30):
+        client.post("/api/applications/", json=application_payload(courses[i % 3], f"KP{i:03d}", first_name="Grace"))
+    client.post("/api/applications/", json=application_payload(
+        courses[0], "KP999", first_name="Grace", last_name="Grace", designation="Grace"))
+
+    first_page = search(client, "grace", page_size=10)
+    assert first_page["total"] == 31
+    assert first_page["results"][0]["staff_number"] == "KP999"
+    assert len(first_page["results"]) == 10
+
+    pages = [staff_numbers(search(client, "grace", page=page, page_size=10)) for page in (1, 2, 3, 4)]
+    assert sum(len(page) for page in pages) == 31
+    assert len({number for page in pages for number in page}) == 31
+
+
+def test_equal_scores_page_newest_first(client, courses):
+    # Same course and names, so every document scores the same
+    for i in range(12):
+        client.post("/api/applications/", json=application_payload(courses[0], f"KP{i:03d}", first_name="Grace"))
+
+    pages = [staff_numbers(search(client, "grace", page=page, page_size=5)) for page in (1, 2, 3)]
+    assert [number for page in pages for number in page] == [f"KP{i:03d}" for i in reversed(range(12))]
+
+
+def test_search_follows_updates(client, courses):
+    client.post("/api/applications/", json=application_payload(courses[0], "KP1", last_name="Achieng"))
+    assert staff_numbers(search(client, "achieng")) == ["KP1"]
+
+    updated = application_payload(courses[1], "KP1", last_name="Omondi")
+    assert client.put("/api/applications/KP1", json=updated).status_code == 200
+    assert staff_numbers(search(client, "achieng")) == []
+    assert staff_numbers(search(client, "omondi")) == ["KP1"]
+    assert staff_numbers(search(client, courses[1].name.split()[-1])) == ["KP1"]
+
+
+def test_rebuild_indexes_bulk_loaded_rows_and_keeps_sync(client, db_session, courses, make_applications):
+    make_applications(5, prefix="BULK")
+    assert search(client, "bulk")["total"] == 0
+
+    assert crud.rebuild_search_index(db_session) == 5
+    assert search(client, "bulk")["total"] == 5
+
+    client.post("/api/applications/", json=application_payload(courses[0], "KP1", first_name="Njeri"))
+    assert staff_numbers(search(client, "njeri")) == ["KP1"]
+
+
+def test_short_tokens_match_as_prefixes(client, courses):
+    client.post("/api/applications/", json=application_payload(
+        courses[0], "KP1001", first_name="Wanjiru", last_name="Kamau"))
+    client.post("/api/applications/", json=application_payload(
+        courses[0], "KP2002", first_name="Otieno", last_name="Kamau"))
+
+    assert staff_numbers(search(client, "wa ka")) == ["KP1001"]
+
+
+def test_mysql_filter_matches_short_tokens_by_regexp():
+    # InnoDB's FULLTEXT index drops tokens under 3 characters; they must
+    # still narrow the results rather than be ignored
+    where, params = crud._mysql_search_filter(["wa", "kamau", "o"])
+    assert where == (
+        "MATCH(document) AGAINST(:match IN BOOLEAN MODE)"
+        " AND document REGEXP :short0 AND document REGEXP :short1"
+    )
+    assert params == {"match": "+kamau*", "short0": r"\bwa", "short1": r"\bo"}
+
+    where, params = crud._mysql_search_filter(["wa"])
+    assert where == "document REGEXP :short0"
+    assert "match" not in params
@@ -0,0 +1,189 @@
+"""
+Seat quotas: limits per course and per mode of study, seat moves on edit,
+and no overbooking when many submissions race for the last seats.
+
+SQLite lets only one writer in at a time, so the threaded race below checks
+the counters but can never hit an InnoDB lock-order deadlock. Deadlock
+handling is covered by injecting MariaDB's deadlock error instead.
+"""
+
+import threading
+
+from sqlalchemy.exc import OperationalError
+
+import crud
+import init_db
+import schemas
+from conftest import ADMIN_HEADERS, application_payload, count_queries
+from database import SessionLocal
+from models import Application, Course, CourseModeQuota, ModeOfStudyEnum
+
+
+def set_quota(client, course_id, **quota):
+    response = client.put(f"/api/courses/{course_id}/quota", json=quota, headers=ADMIN_HEADERS)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_course_seat_limit(client, courses):
+    course = courses[0]
+    set_quota(client, course.id, seat_limit=2)
+
+    for i in range(2):
+        response = client.post("/api/applications/", json=application_payload(course, f"KP{i}"))
+        assert response.status_code == 200, response.text
+
+    response = client.post("/api/applications/", json=application_payload(course, "KP2"))
+    assert response.status_code == 400
+    assert "full" in response.json()["detail"]
+    assert client.get(f"/api/courses/{course.id}/quota").json()["seats_taken"] == 2
+
+
+def test_mode_seat_limit(client, courses):
+    course = courses[0]
+    set_quota(client, course.id, mode_seat_limits={"physical": 1})
+
+    physical = application_payload(course, "KP1", mode_of_study="physical")
+    assert client.post("/api/applications/", json=physical).status_code == 200
+    response = client.post("/api/applications/", json=application_payload(course, "KP2", mode_of_study="physical"))
+    assert response.status_code == 400
+
+    # Other modes have no limit
+    assert client.post("/api/applications/", json=application_payload(course, "KP3")).status_code == 200
+
+    quota = client.get(f"/api/courses/{course.id}/quota").json()
+    assert quota["seats_taken"] == 2
+    assert quota["mode_quotas"] == [{"mode_of_study": "physical", "seat_limit": 1, "seats_taken": 1}]
+
+
+def test_quota_update_keeps_omitted_seat_limit(client, courses):
+    course = courses[0]
+    set_quota(client, course.id, seat_limit=10)
+
+    quota = set_quota(client, course.id, mode_seat_limits={"physical": 3})
+    assert quota["seat_limit"] == 10
+    assert set_quota(client, course.id, seat_limit=None)["seat_limit"] is None
+
+
+def test_negative_seat_limits_rejected(client, courses):
+    for quota in ({"seat_limit": -1}, {"mode_seat_limits": {"online": -1}}):
+        response = client.put(f"/api/courses/{courses[0].id}/quota", json=quota, headers=ADMIN_HEADERS)
+        assert response.status_code == 422, response.text
+
+
+def test_quota_counts_existing_applications(client, db_session, courses, make_applications):
+    make_applications(len(courses) * 2)
+    crud.recount_seats(db_session)
+
+    quota = set_quota(client, courses[0].id, seat_limit=2, mode_seat_limits={"online": 5})
+    assert quota["seats_taken"] == 2
+    assert quota["mode_quotas"][0]["seats_taken"] == 2
+    response = client.post("/api/applications/", json=application_payload(courses[0]))
+    assert response.status_code == 400
+
+
+def test_init_db_recounts_existing_applications(db_session, courses, make_applications):
+    # Applications submitted before seat counting existed start at 0 seats taken
+    make_applications(len(courses) * 3)
+    init_db.recount_seats()
+
+    db_session.expire_all()
+    assert all(db_session.get(Course, course.id).seats_taken == 3 for course in courses)
+
+
+def test_update_moves_seat(client, courses):
+    old, new = courses[0], courses[1]
+    set_quota(client, new.id, seat_limit=1, mode_seat_limits={"blended": 1})
+    assert client.post("/api/applications/", json=application_payload(old, "KP1")).status_code == 200
+
+    moved = application_payload(new, "KP1", mode_of_study="blended")
+    response = client.put("/api/applications/KP1", json=moved)
+    assert response.status_code == 200, response.text
+    assert client.get(f"/api/courses/{old.id}/quota").json()["seats_taken"] == 0
+    new_quota = client.get(f"/api/courses/{new.id}/quota").json()
+    assert new_quota["seats_taken"] == 1
+    assert new_quota["mode_quotas"][0]["seats_taken"] == 1
+
+    # The new course is now full, so moving another applicant there fails
+    # and leaves their original seat untouched
+    assert client.post("/api/applications/", json=application_payload(old, "KP2")).status_code == 200
+    response = client.put("/api/applications/KP2", json=application_payload(new, "KP2"))
+    assert response.status_code == 400
+    assert client.get(f"/api/courses/{old.id}/quota").json()["seats_taken"] == 1
+
+
+def test_update_changing_only_mode_moves_mode_seat(client, courses):
+    course = courses[0]
+    set_quota(client, course.id, mode_seat_limits={"online": 1, "physical": 1})
+    assert client.post("/api/applications/", json=application_payload(course, "KP1")).status_code == 200
+
+    response = client.put("/api/applications/KP1", json=application_payload(course, "KP1", mode_of_study="physical"))
+    assert response.status_code == 200, response.text
+    quota = client.get(f"/api/courses/{course.id}/quota").json()
+    assert quota["seats_taken"] == 1
+    assert {q["mode_of_study"]: q["seats_taken"] for q in quota["mode_quotas"]} == {"online": 0, "physical": 1}
+
+
+def test_parallel_submits_do_not_overbook(db_session, courses):
+    course = courses[0]
+    seats, applicants = 5, 30
+    crud.set_course_quota(db_session, course, schemas.CourseQuotaUpdate(
+        seat_limit=seats, mode_seat_limits={ModeOfStudyEnum.ONLINE: seats}
+    ))
+
+    barrier = threading.Barrier(applicants)
+    outcomes = []
+
+    def submit(i):
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            crud.create_application(db, schemas.ApplicationCreate(**application_payload(course, f"KP{i:03d}")))
+            outcomes.append("ok")
+        except ValueError:
+            outcomes.append("full")
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(applicants)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    db_session.expire_all()
+    assert outcomes.count("ok") == seats
+    assert outcomes.count("full") == applicants - seats
+    assert db_session.query(Application).filter(Application.course_id == course.id).count() == seats
+    assert db_session.get(Course, course.id).seats_taken == seats
+    assert db_session.get(CourseModeQuota, (course.id, ModeOfStudyEnum.ONLINE)).seats_taken == seats
+
+
+def test_submit_retried_after_deadlock(client, courses, monkeypatch):
+    course = courses[0]
+    set_quota(client, course.id, seat_limit=5)
+    take_seat = crud._take_seat
+    calls = []
+
+    def deadlock_once(db, course, mode):
+        calls.append(course.id)
+        if len(calls) == 1:
+            raise OperationalError("UPDATE courses", {}, Exception(crud.MYSQL_DEADLOCK_ERROR, "Deadlock found"))
+        take_seat(db, course, mode)
+
+    monkeypatch.setattr(crud, "_take_seat", deadlock_once)
+    response = client.post("/api/applications/", json=application_payload(course, "KP1"))
+    assert response.status_code == 200, response.text
+    assert len(calls) == 2
+    assert client.get(f"/api/courses/{course.id}/quota").json()["seats_taken"] == 1
+
+
+def test_unlimited_course_submit_takes_no_counter_lock(client, courses):
+    course = courses[0]
+    with count_queries() as counter:
+        assert client.post("/api/applications/", json=application_payload(course, "KP1")).status_code == 200
+    assert not [statement for statement in counter.statements if statement.startswith("UPDATE")]
+    # Seats are still reported, and counted from there once a limit is set
+    assert client.get(f"/api/courses/{course.id}/quota").json()["seats_taken"] == 1
+    assert set_quota(client, course.id, seat_limit=1)["seats_taken"] == 1
+    assert client.post("/api/applications/", json=application_payload(course, "KP2")).status_code == 400
@@ -0,0 +1,91 @@
+"""
+Slow-query log: EXPLAIN capture above the threshold, N+1 detection within a
+request, and the admin diagnostics endpoint.
+"""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import crud
+import slow_queries
+from conftest import ADMIN_HEADERS
+from database import engine
+from models import Application
+
+
+@pytest.fixture(autouse=True)
+def clean_buffer():
+    slow_queries.clear()
+    yield
+    slow_queries.clear()
+
+
+def get_records(client, **params):
+    response = client.get("/api/diagnostics/slow-queries", params=params, headers=ADMIN_HEADERS)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def lazy_get_all_applications(db):
+    # Pre-fix behaviour: the course of each row is lazy-loaded while the
+    # response is serialised
+    return db.query(Application).all()
+
+
+def test_statements_above_threshold_are_explained(client, courses, monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 0)
+    client.get(f"/api/courses/{courses[0].id}")
+
+    records = get_records(client, kind="slow")
+    course_queries = [r for r in records if "FROM courses" in r["statement"]]
+    assert len(course_queries) == 1
+    record = course_queries[0]
+    # Route template, not the concrete path
+    assert record["route"] == "GET /api/courses/{course_id}"
+    assert record["parameters"] and set(record["parameters"]) == {"int"}
+    assert any("SEARCH courses" in line for line in record["plan"][1:])
+
+
+def test_statements_below_threshold_are_not_recorded(client, monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 10_000)
+    client.get("/api/courses/")
+    assert get_records(client) == []
+
+
+def test_lazy_loads_in_a_loop_are_flagged(client, courses, make_applications, monkeypatch):
+    make_applications(len(courses))
+    monkeypatch.setattr(crud, "get_all_applications", lazy_get_all_applications)
+    assert client.get("/api/applications/", headers=ADMIN_HEADERS).status_code == 200
+
+    records = get_records(client, kind="n_plus_one")
+    assert len(records) == 1
+    assert records[0]["route"] == "GET /api/applications/"
+    assert records[0]["count"] == len(courses)
+    assert "FROM courses" in records[0]["statement"]
+
+
+def test_diagnostics_endpoint_requires_admin_and_filters(client, courses, make_applications, monkeypatch):
+    assert client.get("/api/diagnostics/slow-queries").status_code == 401
+
+    make_applications(len(courses))
+    monkeypatch.setattr(crud, "get_all_applications", lazy_get_all_applications)
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 0)
+    client.get("/api/applications/", headers=ADMIN_HEADERS)
+
+    assert {r["kind"] for r in get_records(client, kind="slow")} == {"slow"}
+    assert {r["kind"] for r in get_records(client, kind="n_plus_one")} == {"n_plus_one"}
+    assert len(get_records(client, limit=2)) == 2
+    response = client.get("/api/diagnostics/slow-queries", params={"kind": "other"}, headers=ADMIN_HEADERS)
+    assert response.status_code == 422
+
+
+def test_failed_statements_leave_nothing_on_the_connection(db_session, monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_MS", 0)
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+        assert not [key for key in conn.info if key.endswith("_start")]
+
+        conn.exec_driver_sql("SELECT 1")
+    assert [r["statement"] for r in slow_queries.get_recent(kind="slow")] == ["SELECT 1"]
@@ -15,6 +15,8 @@ export interface Course {
   category: CourseCategoryEnum;
   description?: string;
   is_active: boolean;
+  seat_limit?: number | null;
+  seats_taken?: number;
   created_at: string;
 }
 